@@ -0,0 +1,279 @@
+"""
+The bitboard kernels used by the Othello game logic, a bitboard is a 64 bit integer
+where bit y * BOARD_SIZE + x is set if there is a piece at the position (x, y).
+
+All kernels only work on integers so that they can be compiled by numba when it is installed,
+otherwise they will simply run as normal python functions.
+"""
+
+from Constants import STABILITY_AXES, CORNERS, FULL_BOARD, NOT_LEFT_COLUMN, NOT_RIGHT_COLUMN
+
+try:
+    from numba import njit, uint64, float64
+    from numpy import uint64 as to_int
+except ImportError:
+    njit = None
+    uint64 = float64 = None
+    to_int = int
+
+
+def kernel(return_type, *argument_types):
+    """A decorator that compiles the kernel when numba is installed."""
+
+    def decorator(func):
+        if njit is None:
+            return func
+        return njit(return_type(*argument_types), cache=True, nogil=True)(func)
+
+    return decorator
+
+
+# Numba must see these constants as unsigned 64 bit integers so that they match the bitboard arguments.
+ZERO = to_int(0)
+AXES = tuple(tuple(to_int(value) for value in axis) for axis in STABILITY_AXES)
+CORNER_MASK = to_int(CORNERS)
+FULL_MASK = to_int(FULL_BOARD)
+NOT_LEFT = to_int(NOT_LEFT_COLUMN)
+NOT_RIGHT = to_int(NOT_RIGHT_COLUMN)
+
+
+@kernel(uint64, uint64, uint64, uint64)
+def compute_flips(move, own, opp):
+    """
+    Returns a bitboard of all the pieces that are flipped when placing the move bitboard.
+    Every direction is shifted at once so a line of up to six opposing pieces is found in a few
+    integer operations, the line is then only kept if it is closed by one of our own pieces.
+    Directions without an opposing piece next to the move are skipped straight away.
+    The eight directions of Constants.BIT_SHIFTS are written out one by one,
+    as looping over the directions costs more than the shifts themselves.
+    """
+
+    flips = ZERO
+    opp_mask = opp & NOT_LEFT  # Down right
+    line = (move << 9) & opp_mask
+    if line:
+        line |= (line << 9) & opp_mask
+        line |= (line << 9) & opp_mask
+        line |= (line << 9) & opp_mask
+        line |= (line << 9) & opp_mask
+        line |= (line << 9) & opp_mask
+        if (line << 9) & NOT_LEFT & own:
+            flips |= line
+    opp_mask = opp & NOT_RIGHT  # Down left
+    line = (move << 7) & opp_mask
+    if line:
+        line |= (line << 7) & opp_mask
+        line |= (line << 7) & opp_mask
+        line |= (line << 7) & opp_mask
+        line |= (line << 7) & opp_mask
+        line |= (line << 7) & opp_mask
+        if (line << 7) & NOT_RIGHT & own:
+            flips |= line
+    opp_mask = opp & NOT_LEFT  # Right
+    line = (move << 1) & opp_mask
+    if line:
+        line |= (line << 1) & opp_mask
+        line |= (line << 1) & opp_mask
+        line |= (line << 1) & opp_mask
+        line |= (line << 1) & opp_mask
+        line |= (line << 1) & opp_mask
+        if (line << 1) & NOT_LEFT & own:
+            flips |= line
+    opp_mask = opp  # Down
+    line = (move << 8) & opp_mask
+    if line:
+        line |= (line << 8) & opp_mask
+        line |= (line << 8) & opp_mask
+        line |= (line << 8) & opp_mask
+        line |= (line << 8) & opp_mask
+        line |= (line << 8) & opp_mask
+        if (line << 8) & own:
+            flips |= line
+    opp_mask = opp & NOT_RIGHT  # Up left
+    line = (move >> 9) & opp_mask
+    if line:
+        line |= (line >> 9) & opp_mask
+        line |= (line >> 9) & opp_mask
+        line |= (line >> 9) & opp_mask
+        line |= (line >> 9) & opp_mask
+        line |= (line >> 9) & opp_mask
+        if (line >> 9) & NOT_RIGHT & own:
+            flips |= line
+    opp_mask = opp & NOT_LEFT  # Up right
+    line = (move >> 7) & opp_mask
+    if line:
+        line |= (line >> 7) & opp_mask
+        line |= (line >> 7) & opp_mask
+        line |= (line >> 7) & opp_mask
+        line |= (line >> 7) & opp_mask
+        line |= (line >> 7) & opp_mask
+        if (line >> 7) & NOT_LEFT & own:
+            flips |= line
+    opp_mask = opp & NOT_RIGHT  # Left
+    line = (move >> 1) & opp_mask
+    if line:
+        line |= (line >> 1) & opp_mask
+        line |= (line >> 1) & opp_mask
+        line |= (line >> 1) & opp_mask
+        line |= (line >> 1) & opp_mask
+        line |= (line >> 1) & opp_mask
+        if (line >> 1) & NOT_RIGHT & own:
+            flips |= line
+    opp_mask = opp  # Up
+    line = (move >> 8) & opp_mask
+    if line:
+        line |= (line >> 8) & opp_mask
+        line |= (line >> 8) & opp_mask
+        line |= (line >> 8) & opp_mask
+        line |= (line >> 8) & opp_mask
+        line |= (line >> 8) & opp_mask
+        if (line >> 8) & own:
+            flips |= line
+    return flips
+
+
+@kernel(uint64, uint64, uint64, uint64)
+def gen_moves(own, opp, empty):
+    """
+    Returns a bitboard of every position that can be played by the own pieces.
+    Works the same way as compute_flips but starts from every own piece at once,
+    the position just after a line of opposing pieces is a move if it is empty.
+    """
+
+    moves = ZERO
+    opp_mask = opp & NOT_LEFT  # Down right
+    line = (own << 9) & opp_mask
+    line |= (line << 9) & opp_mask
+    line |= (line << 9) & opp_mask
+    line |= (line << 9) & opp_mask
+    line |= (line << 9) & opp_mask
+    line |= (line << 9) & opp_mask
+    moves |= (line << 9) & NOT_LEFT & empty
+    opp_mask = opp & NOT_RIGHT  # Down left
+    line = (own << 7) & opp_mask
+    line |= (line << 7) & opp_mask
+    line |= (line << 7) & opp_mask
+    line |= (line << 7) & opp_mask
+    line |= (line << 7) & opp_mask
+    line |= (line << 7) & opp_mask
+    moves |= (line << 7) & NOT_RIGHT & empty
+    opp_mask = opp & NOT_LEFT  # Right
+    line = (own << 1) & opp_mask
+    line |= (line << 1) & opp_mask
+    line |= (line << 1) & opp_mask
+    line |= (line << 1) & opp_mask
+    line |= (line << 1) & opp_mask
+    line |= (line << 1) & opp_mask
+    moves |= (line << 1) & NOT_LEFT & empty
+    opp_mask = opp  # Down
+    line = (own << 8) & opp_mask
+    line |= (line << 8) & opp_mask
+    line |= (line << 8) & opp_mask
+    line |= (line << 8) & opp_mask
+    line |= (line << 8) & opp_mask
+    line |= (line << 8) & opp_mask
+    moves |= (line << 8) & empty
+    opp_mask = opp & NOT_RIGHT  # Up left
+    line = (own >> 9) & opp_mask
+    line |= (line >> 9) & opp_mask
+    line |= (line >> 9) & opp_mask
+    line |= (line >> 9) & opp_mask
+    line |= (line >> 9) & opp_mask
+    line |= (line >> 9) & opp_mask
+    moves |= (line >> 9) & NOT_RIGHT & empty
+    opp_mask = opp & NOT_LEFT  # Up right
+    line = (own >> 7) & opp_mask
+    line |= (line >> 7) & opp_mask
+    line |= (line >> 7) & opp_mask
+    line |= (line >> 7) & opp_mask
+    line |= (line >> 7) & opp_mask
+    line |= (line >> 7) & opp_mask
+    moves |= (line >> 7) & NOT_LEFT & empty
+    opp_mask = opp & NOT_RIGHT  # Left
+    line = (own >> 1) & opp_mask
+    line |= (line >> 1) & opp_mask
+    line |= (line >> 1) & opp_mask
+    line |= (line >> 1) & opp_mask
+    line |= (line >> 1) & opp_mask
+    line |= (line >> 1) & opp_mask
+    moves |= (line >> 1) & NOT_RIGHT & empty
+    opp_mask = opp  # Up
+    line = (own >> 8) & opp_mask
+    line |= (line >> 8) & opp_mask
+    line |= (line >> 8) & opp_mask
+    line |= (line >> 8) & opp_mask
+    line |= (line >> 8) & opp_mask
+    line |= (line >> 8) & opp_mask
+    moves |= (line >> 8) & empty
+    return moves
+
+
+def bit_count(board):
+    """Counts the pieces in a bitboard, int.bit_count is only available from Python 3.10."""
+
+    return bin(board).count("1")
+
+
+if hasattr(int, "bit_count"):
+    bit_count = int.bit_count
+
+if njit is None:
+    popcount = bit_count
+else:
+    @kernel(uint64, uint64)
+    def popcount(board):
+        """Counts the pieces in a bitboard, numba does not support int.bit_count."""
+
+        board = board - ((board >> to_int(1)) & to_int(0x5555555555555555))
+        board = (board & to_int(0x3333333333333333)) + ((board >> to_int(2)) & to_int(0x3333333333333333))
+        board = (board + (board >> to_int(4))) & to_int(0x0F0F0F0F0F0F0F0F)
+        return ((board * to_int(0x0101010101010101)) & FULL_MASK) >> to_int(56)
+
+
+@kernel(uint64, uint64)
+def stable_pieces(own):
+    """
+    Returns an estimation of the pieces that can never be flipped.
+    A piece is stable if along each of the four lines it is next to the edge of the board or
+    next to another stable piece, so stable pieces spread out from the corners until nothing changes.
+    """
+
+    stable = ZERO
+    if not own & CORNER_MASK:
+        return stable
+    while True:
+        new_stable = own
+        for amount, left_mask, right_mask, edge in AXES:
+            new_stable &= ((stable << amount) & left_mask) | ((stable >> amount) & right_mask) | edge
+        new_stable |= stable
+        if new_stable == stable:
+            return stable
+        stable = new_stable
+
+
+@kernel(float64, uint64, uint64, uint64, uint64)
+def heuristic(white, black, white_moves, black_moves):
+    """
+    Calculates the heuristic utility of a board from white's point of view using its bitboards.
+    Combines the corners captured, mobility, stability and piece count as in AI.heuristic_utility.
+    """
+
+    white_count, black_count = float(popcount(white)), float(popcount(black))
+    heuristic_piece_count = (white_count - black_count) / (white_count + black_count)
+
+    white_move_count, black_move_count = float(popcount(white_moves)), float(popcount(black_moves))
+    heuristic_mobility = (white_move_count - black_move_count) / (white_move_count + black_move_count)
+
+    white_corners, black_corners = float(popcount(white & CORNER_MASK)), float(popcount(black & CORNER_MASK))
+    if white_corners + black_corners != 0:  # Division by zero error
+        heuristic_corner_capture = (white_corners - black_corners) / (white_corners + black_corners)
+    else:
+        heuristic_corner_capture = 0.0
+
+    white_stability, black_stability = float(popcount(stable_pieces(white))), float(popcount(stable_pieces(black)))
+    if white_stability + black_stability != 0:  # Division by zero error
+        heuristic_stability = (white_stability - black_stability) / (white_stability + black_stability)
+    else:
+        heuristic_stability = 0.0
+
+    return 30 * heuristic_corner_capture + heuristic_mobility * 5 + heuristic_stability * 25 + heuristic_piece_count * 25
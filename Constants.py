@@ -44,9 +44,32 @@ FLIP_RULE = {"W": "B", "B": "W", "E": "E"}
 FLIP_LINES = [(-1, -1), (-1, 1), (1, -1), (1, 1), (1, 0), (-1, 0), (0, 1), (0, -1)]
 FULL_NAME = {"W": "White", "B": "Black", "E": "Empty"}
 
+# Bitboard masks, bit y * BOARD_SIZE + x represents the position (x, y)
+FULL_BOARD = (1 << BOARD_SIZE * BOARD_SIZE) - 1
+NOT_LEFT_COLUMN = 0xFEFEFEFEFEFEFEFE  # Used after shifting right as pieces can not wrap round to x = 0
+NOT_RIGHT_COLUMN = 0x7F7F7F7F7F7F7F7F
+# The shift amount of each direction in FLIP_LINES as well as the mask that removes wrapped pieces
+BIT_SHIFTS = [(step_y * BOARD_SIZE + step_x,
+               NOT_LEFT_COLUMN if step_x == 1 else NOT_RIGHT_COLUMN if step_x == -1 else FULL_BOARD)
+              for (step_x, step_y) in FLIP_LINES]
+LEFT_BIT_SHIFTS = [(amount, mask) for (amount, mask) in BIT_SHIFTS if amount > 0]
+RIGHT_BIT_SHIFTS = [(-amount, mask) for (amount, mask) in BIT_SHIFTS if amount < 0]
+CORNERS = 0x8100000000000081
+SIDE_COLUMNS = 0x8181818181818181
+TOP_BOTTOM_ROWS = 0xFF000000000000FF
+BOARD_EDGE = SIDE_COLUMNS | TOP_BOTTOM_ROWS
+# The four lines a piece can be flipped along, as the shift amount, the masks used to shift
+# both ways and the positions where that line ends at the edge of the board.
+STABILITY_AXES = [(amount, mask, dict(RIGHT_BIT_SHIFTS)[amount],
+                   SIDE_COLUMNS if amount == 1 else TOP_BOTTOM_ROWS if amount == BOARD_SIZE else BOARD_EDGE)
+                  for (amount, mask) in LEFT_BIT_SHIFTS]
+
 XOR_INDICES = {"W": 1, "B": 2, "E": 0}
 
 DIFFICULTY_TO_AI_CONFIG = {"Easy": (None, None), "Normal": (5, 3), "Hard": (20, 3), "Insane": (24, 10)}
+AI_MIN_TURN_TIME = 1  # In seconds, so that the AI does not play instantly
+HEURISTIC_CACHE_SIZE = 700000  # Around 200MB of cached board evaluations at about 290 bytes each
+TRANSPOSITION_TABLE_MASK = (1 << 20) - 1  # The lowest bits of a zobrist hash pick its slot in the search dictionary
 
 # In y,x notation
 SAFE_LINES = [(0, 0, (0, 1)), (0, 0, (1, 0)),
@@ -90,11 +113,6 @@ LAST_BOARD = [[START_POS.get((x, y), "E") for x in range(BOARD_SIZE)] for y in r
 HELP_POSSIBLE1 = [(3, 2), (2, 3), (5, 4), (4, 5)]
 HELP_POSSIBLE2 = [(5, 3), (5, 5), (3, 5)]
 
-# In y,x form
-LEFT_RIGHT_DIAGONALS = [(y, 0) for y in range(BOARD_SIZE - 2)] + [(0, x) for x in
-                                                                  range(1, BOARD_SIZE - 2)]  # \ from top
-RIGHT_LEFT_DIAGONALS = [(y, BOARD_SIZE - 1) for y in range(BOARD_SIZE - 2)] + [(0, x) for x in
-                                                                               range(2, BOARD_SIZE)]  # / from top
 BOARD_WEIGHT = [[100,-10, 11,  6,  6, 11,-10,100],
                 [-10,-20,  1,  2,  2,  1,-20,-10],
                 [ 10,  1,  5,  4,  4,  5,  1, 10],
@@ -103,3 +121,5 @@ BOARD_WEIGHT = [[100,-10, 11,  6,  6, 11,-10,100],
                 [ 10,  1,  5,  4,  4,  5,  1, 10],
                 [-10,-20,  1,  2,  2,  1,-20,-10],
                 [100,-10, 11,  6,  6, 11,-10,100]]
+# Indexed by y * BOARD_SIZE + x like the bitboards, BOARD_WEIGHT is indexed by [x][y]
+BOARD_WEIGHT_FLAT = tuple(BOARD_WEIGHT[x][y] for y in range(BOARD_SIZE) for x in range(BOARD_SIZE))
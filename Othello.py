@@ -3,13 +3,14 @@ This python file deals with all Othello game logic. This includes saving and loa
 games as well as interfacing with the GUI.
 """
 
-from copy import deepcopy
+from functools import lru_cache
 from os import path, remove, listdir, mkdir
 from tempfile import NamedTemporaryFile
 from random import getrandbits
 from time import time, sleep
 
 from Constants import *
+from BitboardKernels import bit_count, compute_flips, gen_moves, heuristic
 
 
 class BoardError(Exception):
@@ -18,145 +19,181 @@ class BoardError(Exception):
     pass
 
 
-class HashedBoard:
-    """A special board that can be stored in a dictionary to save pre-calculated AI moves."""
+class SearchEntry:
+    """
+    A previously searched board's minimax value, stored in the AI's search dictionary.
+    The full zobrist hash is kept as different boards can share the same slot.
+    """
 
-    def __init__(self, board, hash_num):
-        self.board = board
+    __slots__ = ("hash_num", "value", "type_of_info", "depth", "move")
+
+    def __init__(self, hash_num, value, type_of_info, depth, move):
         self.hash_num = hash_num
-        self.depth = None
-        self.value = None
-        self.type_of_info = None
+        self.value = value
+        self.type_of_info = type_of_info  # 0 is a lower bound, 1 is an exact value and 2 is an upper bound
+        self.depth = depth
+        self.move = move
 
-    def __hash__(self):
-        """
-        The hash function is used in a python dictionary (hash table),
-        this function ensures a zobrist hash of the board is returned.
-        """
 
-        return self.hash_num
+class SearchFrame:
+    """A board that the AI is part way through searching the moves of."""
+
+    __slots__ = ("hash_num", "actions", "alpha_orig", "beta_orig", "window_alpha", "window_beta",
+                 "maximising_player", "lookahead", "score", "action", "current_action")
+
+    def __init__(self, hash_num, actions, alpha_orig, beta_orig, alpha, beta, maximising_player, lookahead):
+        self.hash_num = hash_num
+        self.actions = actions  # A generator of the sorted moves
+        self.alpha_orig, self.beta_orig = alpha_orig, beta_orig  # The window before the search dictionary was used
+        self.window_alpha, self.window_beta = alpha, beta  # Narrowed as moves are searched
+        self.maximising_player = maximising_player
+        self.lookahead = lookahead
+        self.score = AI.NEG_INF if maximising_player else AI.INF
+        self.action = None
+        self.current_action = None
+
+
+def bit(x, y):
+    """Returns the bitboard mask of a single position."""
+
+    return 1 << (y * BOARD_SIZE + x)
+
+
+def bit_squares(board):
+    """An iterator that returns the index y * BOARD_SIZE + x of every piece in a bitboard."""
+
+    while board:
+        lowest = board & -board
+        yield lowest.bit_length() - 1
+        board ^= lowest
 
-    def __eq__(self, other):
-        """
-        Used for the python dictionary to ensure two boards in the same position
-        are the same board and not a collision.
-        """
 
-        return self.board == other.board
+def bit_positions(board):
+    """An iterator that returns the (x, y) position of every piece in a bitboard."""
 
-    def __deepcopy__(self, memo=None):
-        """Used to copy the board correctly."""
+    for square in bit_squares(board):
+        yield square % BOARD_SIZE, square // BOARD_SIZE
 
-        return HashedBoard(deepcopy(self.board), self.hash_num)
+
+def read_save_file(save_name):
+    """
+    Reads every position from a save file.
+    The whole file is read as bytes at once and split, so no line is decoded into a string.
+    """
+
+    with open(path.join(SAVE_DIR, save_name), 'rb') as file:
+        data = file.read()
+    return [(int(x), int(y)) for x, y in (line.split(b",") for line in data.splitlines())]
 
 
 class Othello:
     """An abstract class that deals with all Othello logic"""
 
+    # Subclasses that do not set __slots__ still get a __dict__ for their own attributes
+    __slots__ = ("W", "B", "last_board", "moves", "legal")
+
     def __init__(self, board=None):
+        self.W, self.B = 0, 0  # One bitboard per colour, bit y * BOARD_SIZE + x is set if the piece is there
         if board is not None:
+            self.last_board = None
             self.board = board
         else:
-            self.board = LAST_BOARD
-            board = [[START_POS.get((x, y), "E") for x in range(BOARD_SIZE)] for y in range(BOARD_SIZE)]
-            # Not directly assigning so I can keep same reference for other files to use the last board
-            for y in range(BOARD_SIZE):
-                for x in range(BOARD_SIZE):
-                    self.board[y][x] = board[y][x]
-
-        self.possible_moves = {"W": {}, "B": {}}
+            # Keeping the same reference updated so other files can use the last board
+            self.last_board = LAST_BOARD
+            for (x, y), colour in START_POS.items():
+                if colour == "W":
+                    self.W |= bit(int(x), int(y))
+                else:
+                    self.B |= bit(int(x), int(y))
+
+        self.moves = {"W": 0, "B": 0}
         self.board_change()
 
-    def flip(self, pos):
-        """Flips a piece at a certain position"""
-
-        self.board[pos[1]][pos[0]] = FLIP_RULE[self.board[pos[1]][pos[0]]]
-
-    def line_iterator(self, pos, current_colour, check_lines):
-        """A custom line iterator that checks whether a certain piece being placed needs to flip other pieces. """
-
-        for (step_x, step_y) in check_lines:
-            done_first_iter, flip_line_holds, i = False, False, 0
+    @property
+    def board(self):
+        """
+        A list of lists view of the bitboards, only built when it is needed such as
+        when the board is sent to the GUI.
+        """
 
-            for i in range(1, BOARD_SIZE):  # Check if flip can be made
-                x, y = step_x * i + pos[0], step_y * i + pos[1]
-                if not (0 <= x < 8 and 0 <= y < 8):
-                    break
-                if not done_first_iter:
-                    done_first_iter = True
-                    if self.board[y][x] != FLIP_RULE[current_colour]:
-                        break
-                elif self.board[y][x] == current_colour:  # Check line end for empty
-                    flip_line_holds = True
-                    break
-                elif self.board[y][x] == "E":
-                    break
+        cells = ["E"] * (BOARD_SIZE * BOARD_SIZE)  # Built as one flat buffer then cut into rows
+        for square in bit_squares(self.W):
+            cells[square] = "W"
+        for square in bit_squares(self.B):
+            cells[square] = "B"
+        board = [cells[y * BOARD_SIZE:(y + 1) * BOARD_SIZE] for y in range(BOARD_SIZE)]
+        if self.last_board is None:
+            return board
+        for y in range(BOARD_SIZE):
+            self.last_board[y][:] = board[y]
+        return self.last_board
 
-            if flip_line_holds:  # Once we know the line holds iterate through again to get x and y pos
-                for z in range(1, i):  # Flip
-                    x, y = step_x * z + pos[0], step_y * z + pos[1]
-                    yield x, y, (step_x, step_y)
+    @board.setter
+    def board(self, board):
+        """Sets the bitboards from a list of lists board."""
 
-    def check_flip_line(self, pos, current_colour, check_line):
-        """This checks if a certain possible flip leads to a valid result"""
-
-        try:
-            return next(self.line_iterator(pos, current_colour, [check_line]))[2]
-        except StopIteration:
-            return None
+        self.W, self.B = 0, 0
+        for square, colour in enumerate(colour for row in board for colour in row):
+            if colour == "W":
+                self.W |= 1 << square
+            elif colour == "B":
+                self.B |= 1 << square
 
     def flip_line(self, pos, current_colour):
-        """This uses the pre calculated values to flip pieces."""
+        """Flips all the pieces captured by a piece placed at pos and returns them as a bitboard."""
 
-        for (x, y, step_tup) in self.line_iterator(pos, current_colour, self.possible_moves[current_colour][pos]):
-            self.flip((x, y))
+        flips = self.legal_moves(current_colour)[pos[1] * BOARD_SIZE + pos[0]]
+        self.W ^= flips
+        self.B ^= flips
+        return flips
 
     def place(self, pos, current_colour):
         """Place the piece, flips the correct pieces and then signals a board change."""
 
-        self.board[pos[1]][pos[0]] = current_colour
         self.flip_line(pos, current_colour)
+        self.set_piece(pos, current_colour)
         self.board_change()
         return pos
 
+    def set_piece(self, pos, current_colour):
+        """Places a single piece on an empty position without flipping any other pieces."""
+
+        if current_colour == "W":
+            self.W |= bit(*pos)
+        else:
+            self.B |= bit(*pos)
+
     def board_change(self):
         """
-        Prepares for pre-calculation of values by removing positions that are not placeable,
-        such as places with pieces or empty positions surrounded by other empty positions
+        Pre-calculates the bitboard of the possible moves for both colours.
+        The pieces each move flips are only calculated once they are needed by legal_moves.
         """
 
-        self.possible_moves = {"W": {}, "B": {}}
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                if self.board[y][x] == "E":
-                    for adjacency in self.adjacent((x, y)):
-                        if adjacency[0] == "W":
-                            check_flip_line = self.check_flip_line((x, y), "B", adjacency[1])
-                            if check_flip_line:
-                                if (old := self.possible_moves["B"].get((x, y))) is not None:  # Checked with timeit
-                                    self.possible_moves["B"][(x, y)] = old + [check_flip_line]
-                                else:
-                                    self.possible_moves["B"][(x, y)] = [check_flip_line]
-                        elif adjacency[0] == "B":
-                            check_flip_line = self.check_flip_line((x, y), "W", adjacency[1])
-                            if check_flip_line:
-                                if (old := self.possible_moves["W"].get((x, y))) is not None:
-                                    self.possible_moves["W"][(x, y)] = old + [check_flip_line]
-                                else:
-                                    self.possible_moves["W"][(x, y)] = [check_flip_line]
-
-    def adjacent(self, pos):
+        empty = ~(self.W | self.B) & FULL_BOARD
+        self.moves = {"W": gen_moves(self.W, self.B, empty), "B": gen_moves(self.B, self.W, empty)}
+        self.legal = {"W": None, "B": None}
+
+    def legal_moves(self, current_colour):
+        """Returns a dictionary of every possible move's position index and the bitboard of the pieces it flips."""
+
+        if (legal := self.legal[current_colour]) is None:
+            if current_colour == "W":
+                own, opp = self.W, self.B
+            else:
+                own, opp = self.B, self.W
+            legal = self.legal[current_colour] = {square: compute_flips(1 << square, own, opp)
+                                                  for square in bit_squares(self.moves[current_colour])}
+        return legal
+
+    @property
+    def possible_moves(self):
         """
-        Returns all pieces around a certain position whilst ensuring they are valid.
-        By using an iterator instead of returning all positions, we can run
-        the algorithm much faster as in most cases not every position will
-        need to be checked.
+        The possible moves of both colours as dictionaries of positions and the pieces each move flips,
+        only built when it is needed such as when the moves are sent to the GUI.
         """
 
-        for (step_x, step_y) in FLIP_LINES:
-            x, y = pos[0] + step_x, pos[1] + step_y
-            if 0 <= x < BOARD_SIZE and 0 <= y < BOARD_SIZE and self.board[y][x] != "E":
-                yield self.board[y][x], (step_x, step_y)
+        return {colour: {(square % BOARD_SIZE, square // BOARD_SIZE): flips
+                         for square, flips in self.legal_moves(colour).items()} for colour in ("W", "B")}
 
     def can_be_placed(self, pos, current_colour):
         """
@@ -170,7 +207,7 @@ class Othello:
             return pos, False
 
         if 0 <= pos[0] < BOARD_SIZE and 0 <= pos[1] < BOARD_SIZE:
-            if pos in self.possible_moves[current_colour].keys():
+            if bit(*pos) & self.moves[current_colour]:
                 return pos, True
         return pos, False
 
@@ -181,10 +218,10 @@ class Othello:
         """
 
         while True:
-            if len(self.possible_moves[colour]):  # Check if a move can be played
+            if self.moves[colour]:  # Check if a move can be played
                 yield colour
                 colour = FLIP_RULE[colour]
-            elif len(self.possible_moves[FLIP_RULE[colour]]):  # Preemptive turn change
+            elif self.moves[FLIP_RULE[colour]]:  # Preemptive turn change
                 colour = FLIP_RULE[colour]
                 yield colour
             else:
@@ -193,11 +230,8 @@ class Othello:
     def count_pieces(self):
         """Counts all the pieces on a board and returns that count."""
 
-        count = {"W": 0, "B": 0, "E": 0}
-        for x in range(BOARD_SIZE):
-            for y in range(BOARD_SIZE):
-                count[self.board[x][y]] += 1
-        return count
+        white, black = bit_count(self.W), bit_count(self.B)
+        return {"W": white, "B": black, "E": BOARD_SIZE * BOARD_SIZE - white - black}
 
     def print_board(self):
         """A function used to print the board, it must be implemented in this classes' children."""
@@ -218,17 +252,30 @@ class HashedLocalVersus(Othello):
     This allows hashes to be produced very quickly as they do not need to be recomputed for each move.
     """
 
-    def __init__(self, board_state: HashedBoard, possible_moves, table):
-        self.board_state = board_state
-        self.board = self.board_state.board
-        self.possible_moves = possible_moves
-        self.table = table
+    __slots__ = ("hash_num", "table_place", "table_flip", "table_turn")
+
+    def __init__(self, white, black, hash_num, moves, legal, table_place, table_flip, table_turn):
+        self.W, self.B = white, black
+        self.hash_num = hash_num
+        self.last_board = None
+        self.moves = moves
+        self.legal = legal
+        self.table_place = table_place  # The XOR of an empty position and a piece of each colour
+        self.table_flip = table_flip  # The XOR of a white and black piece, used as flipping changes both
+        self.table_turn = table_turn  # XORed when it is black's turn so the same board can be stored for each player
+
+    def state(self):
+        """
+        Returns everything that changes when a piece is placed, the AI uses this to make and unmake moves
+        on the same board instead of creating a new board for every move.
+        """
+
+        return self.W, self.B, self.hash_num, self.moves, self.legal
 
-    def __deepcopy__(self, memo=None):
-        """Allows for efficient copying of the game state."""
+    def restore(self, state):
+        """Sets the board back to a state returned by the state method."""
 
-        return HashedLocalVersus(deepcopy(self.board_state), self.possible_moves,
-                                 self.table)  # self.possible_moves and self.table are never changed during runtime
+        self.W, self.B, self.hash_num, self.moves, self.legal = state
 
     def place(self, pos, current_colour):
         """
@@ -236,27 +283,40 @@ class HashedLocalVersus(Othello):
         When placing a piece it will XOR the correct numbers to create the correct hash.
         """
 
-        self.board[pos[1]][pos[0]] = current_colour
-        self.board_state.hash_num = self.board_state.hash_num ^ self.table[pos[1] * BOARD_SIZE + pos[0]][
-            XOR_INDICES["E"]]
-        self.board_state.hash_num = self.board_state.hash_num ^ self.table[pos[1] * BOARD_SIZE + pos[0]][
-            XOR_INDICES[current_colour]]
         self.flip_line(pos, current_colour)
+        self.set_piece(pos, current_colour)
+        self.hash_num ^= self.table_place[current_colour][pos[1] * BOARD_SIZE + pos[0]]
         self.board_change()
         return pos
 
-    def flip(self, pos):
+    def move_hash(self, square, current_colour):
         """
-        Flips a piece at a certain position.
-        When flipping a piece it will XOR the correct numbers to create the correct hash.
+        Returns the zobrist hash the board would have after a piece of current_colour is placed at square,
+        without placing it. This lets the AI look a move up in the search dictionary before playing it.
         """
 
-        current_colour = self.board[pos[1]][pos[0]]
-        self.board[pos[1]][pos[0]] = FLIP_RULE[current_colour]
-        self.board_state.hash_num = self.board_state.hash_num ^ self.table[pos[1] * BOARD_SIZE + pos[0]][
-            XOR_INDICES[current_colour]]
-        self.board_state.hash_num = self.board_state.hash_num ^ self.table[pos[1] * BOARD_SIZE + pos[0]][
-            XOR_INDICES[FLIP_RULE[current_colour]]]
+        hash_num, table_flip = self.hash_num ^ self.table_place[current_colour][square], self.table_flip
+        remaining = self.legal_moves(current_colour)[square]
+        while remaining:
+            lowest = remaining & -remaining
+            hash_num ^= table_flip[lowest.bit_length() - 1]
+            remaining ^= lowest
+        return hash_num
+
+    def flip_line(self, pos, current_colour):
+        """
+        Flips all the pieces captured by a piece placed at pos and returns them as a bitboard.
+        Each flipped piece will XOR the correct number to create the correct hash.
+        """
+
+        flips = super().flip_line(pos, current_colour)
+        remaining, hash_num, table_flip = flips, self.hash_num, self.table_flip
+        while remaining:
+            lowest = remaining & -remaining
+            hash_num ^= table_flip[lowest.bit_length() - 1]
+            remaining ^= lowest
+        self.hash_num = hash_num
+        return flips
 
 
 class SaveGame(Othello):
@@ -265,22 +325,23 @@ class SaveGame(Othello):
     def __init__(self):
         self.init = True  # Used to check if save is ran for the first time.
         self.saving_name = None
+        self.save_file = None
         super().__init__()
 
-    def save(self, instruction):
+    def save(self, instruction, flush=True):
         """
         Creates a file that has an unused name and then saves to that file every time a new piece is placed.
         The saved file contains all instructions to get to the current board state, assuming same starting piece.
+        The file is kept open for the whole game, flush can be set to False when saving several moves at once.
         """
 
         if self.init:
             try:
-                save_file = NamedTemporaryFile(mode="a", delete=False, dir=SAVE_DIR, suffix=SAVE_SUFFIX)
+                self.save_file = NamedTemporaryFile(mode="a", delete=False, dir=SAVE_DIR, suffix=SAVE_SUFFIX)
             except FileNotFoundError:
                 mkdir(SAVE_DIR)
-                save_file = NamedTemporaryFile(mode="a", delete=False, dir=SAVE_DIR, suffix=SAVE_SUFFIX)
-            self.saving_name = save_file.name
-            save_file.close()
+                self.save_file = NamedTemporaryFile(mode="a", delete=False, dir=SAVE_DIR, suffix=SAVE_SUFFIX)
+            self.saving_name = self.save_file.name
 
             try:
                 # Check if more than 15 saved games are stored
@@ -293,9 +354,21 @@ class SaveGame(Othello):
                 print("Error encountered... Are you running the same Othello process twice?")
 
             self.init = False
-        instruction = str(instruction[0]) + "," + str(instruction[1]) + "\n"
-        with open(path.join(SAVE_DIR, self.saving_name), 'a') as file:
-            file.write(instruction)
+        self.save_file.write(str(instruction[0]) + "," + str(instruction[1]) + "\n")
+        if flush:
+            self.save_file.flush()
+
+    def flush_save(self):
+        """Ensures all saved moves are written to the save file."""
+
+        if self.save_file is not None:
+            self.save_file.flush()
+
+    def close_save(self):
+        """Closes the save file, run once the game has ended."""
+
+        if self.save_file is not None:
+            self.save_file.close()
 
 
 class LocalVersus(SaveGame):
@@ -316,6 +389,7 @@ class LocalVersus(SaveGame):
             if answer[0] == LOCAL_IO["Click"]:
                 return answer[1]
             elif answer[0] == LOCAL_IO["End"]:
+                self.close_save()
                 quit()
             else:
                 self.gui_to_oth.put(answer)
@@ -348,6 +422,7 @@ class LocalVersus(SaveGame):
         count = self.count_pieces()
         del count["E"]
         self.oth_to_gui.put((LOCAL_IO["Winner"], count))
+        self.close_save()
         quit()
 
 
@@ -370,6 +445,7 @@ class NetworkVersus(LocalVersus):
                     self.oth_to_network.put((LOCAL_IO["Net_Send"], answer[1]))
                     return answer[1]
             elif answer[0] == LOCAL_IO["End"]:
+                self.close_save()
                 quit()
             elif answer[0] == LOCAL_IO["Net_Click"]:
                 if self.playing_colour != self.colour:
@@ -418,8 +494,9 @@ class NetworkVersus(LocalVersus):
         for line, self.playing_colour in zip(commands.splitlines(), self.end_game_iterator(self.playing_colour)):
             if not (tup := self.can_be_placed(self.get_pos_from_file(line), self.playing_colour))[1]:  # Walrus op
                 raise BoardError("Incorrect Board")
-            self.save(tup[0])
+            self.save(tup[0], False)
             self.place(tup[0], self.playing_colour)
+        self.flush_save()
         self.playing_colour = FLIP_RULE[self.playing_colour]
         self.print_board()
 
@@ -433,12 +510,27 @@ class NetworkVersus(LocalVersus):
 class AI(LocalVersus):
     """A class used for the AI of the game."""
 
+    INF = float("inf")  # Created once as minimax is called many times per move
+    NEG_INF = -INF
+
     def __init__(self, gui_to_oth, oth_to_gui, difficulty):
         self.table = [[getrandbits(64) for _ in range(3)] for _ in range(BOARD_SIZE * BOARD_SIZE)]
         # Creates the zobrist hash table that allows zobrist hashes to be created.
+        # Placing and flipping always XOR the same two numbers together so they are combined beforehand.
+        self.table_place = {colour: [square[XOR_INDICES["E"]] ^ square[XOR_INDICES[colour]] for square in self.table]
+                            for colour in ("W", "B")}
+        self.table_flip = [square[XOR_INDICES["W"]] ^ square[XOR_INDICES["B"]] for square in self.table]
+        self.empty_hash = 0  # The hash of an empty board
+        for square in self.table:
+            self.empty_hash ^= square[XOR_INDICES["E"]]
+        self.table_turn = getrandbits(64)
 
         self.ai_colour = "W"
         self.search_dict = {}
+        # The last two moves that caused a cut at each ply of the search, kept between searches
+        self.killer_moves = [[None, None] for _ in range(BOARD_SIZE * BOARD_SIZE)]
+        # How much each square has caused a cut for each colour at any ply, halved every turn
+        self.history = {"W": [0] * (BOARD_SIZE * BOARD_SIZE), "B": [0] * (BOARD_SIZE * BOARD_SIZE)}
         self.difficulty, self.search_time = DIFFICULTY_TO_AI_CONFIG[difficulty]
         super(AI, self).__init__(gui_to_oth, oth_to_gui)
 
@@ -473,28 +565,48 @@ class AI(LocalVersus):
     def ai_play(self):
         """Run when the AI should play."""
 
+        start_time = time()
+        AI.heuristic_utility.cache_clear()
+        for colour, history in self.history.items():
+            self.history[colour] = [count >> 1 for count in history]
         if self.difficulty is None:
-            score, best_move = AI.minimax(self.get_hash_version(), float('-inf'), float('+inf'), True, True, 1, {})
-            sleep(1)
+            score, best_move = AI.minimax(self.get_hash_version(), AI.NEG_INF, AI.INF, True, True, 1, {},
+                                          self.killer_moves, self.history)
         else:
             score, best_move = AI.iterative_deepening(self.get_hash_version(), self.difficulty, self.search_time,
-                                                      self.search_dict)
-
-            self.search_dict = {k: (v[0], v[1], (v[2] - 2), v[3]) for (k, v) in self.search_dict.items() if v[2] >= 3}
+                                                      self.search_dict, self.killer_moves, self.history)
+
+            # Two moves have been played since so every entry is aged in place
+            for key in list(self.search_dict):
+                entry = self.search_dict[key]
+                if entry.depth < 3:
+                    del self.search_dict[key]
+                else:
+                    entry.depth -= 2
+            # The same for the killer moves, each ply is now two plies closer to the root
+            del self.killer_moves[:2]
+            self.killer_moves += [[None, None], [None, None]]
+
+        # Only wait once the move has been found so that no search time is lost
+        sleep(max(0, start_time + AI_MIN_TURN_TIME - time()))
         return best_move
 
     def get_hash_version(self):
-        """Creates a zobrist hash board of the current board."""
+        """
+        Creates a zobrist hash board of the current board.
+        The bitboards are integers so they are passed directly without needing to be copied.
+        """
 
-        zobrist_hash = 0
-        for y in range(BOARD_SIZE):
-            for x in range(BOARD_SIZE):
-                zobrist_hash ^= self.table[y * BOARD_SIZE + x][XOR_INDICES[self.board[y][x]]]   # XOR
+        zobrist_hash = self.empty_hash
+        for colour, board in (("W", self.W), ("B", self.B)):
+            for square in bit_squares(board):
+                zobrist_hash ^= self.table_place[colour][square]   # XOR
 
-        return HashedLocalVersus(HashedBoard(deepcopy(self.board), zobrist_hash), self.possible_moves, self.table)
+        return HashedLocalVersus(self.W, self.B, zobrist_hash, self.moves, self.legal, self.table_place,
+                                 self.table_flip, self.table_turn)
 
     @staticmethod
-    def mtdf(board: HashedLocalVersus, first_guess, lookahead, search_dict):
+    def mtdf(board: HashedLocalVersus, first_guess, lookahead, search_dict, killer_moves, history):
         """
         This is a modified minimax algorithm called Memory-enhanced Test Driver.
         It works by continually testing certain minimax values to try "zoom" into the correct minimax value.
@@ -503,14 +615,14 @@ class AI(LocalVersus):
         """
 
         guess = first_guess
-        upper_bound = float('+inf')
-        lower_bound = float('-inf')
+        upper_bound = AI.INF
+        lower_bound = AI.NEG_INF
         while lower_bound < upper_bound:
             if guess == lower_bound:
                 beta = guess + 1
             else:
                 beta = guess
-            guess, move = AI.minimax(board, beta - 1, beta, True, True, lookahead, search_dict)
+            guess, move = AI.minimax(board, beta - 1, beta, True, True, lookahead, search_dict, killer_moves, history)
             if guess < beta:
                 upper_bound = guess
             else:
@@ -518,7 +630,7 @@ class AI(LocalVersus):
         return guess, move
 
     @staticmethod
-    def iterative_deepening(board: HashedLocalVersus, difficulty, search_time, search_dict):
+    def iterative_deepening(board: HashedLocalVersus, difficulty, search_time, search_dict, killer_moves, history):
         """
         Iterative deepening will bit by bit increase the depth of the search
         this ensures that the algorithm can be stopped if it takes too long.
@@ -528,31 +640,23 @@ class AI(LocalVersus):
         start_time = time()
         for depth in range(1, difficulty):
             if depth % 2 == 0:
-                first_guess, move = AI.mtdf(board, even_guess, depth, search_dict)
+                first_guess, move = AI.mtdf(board, even_guess, depth, search_dict, killer_moves, history)
                 even_guess = first_guess
             else:
-                first_guess, move = AI.mtdf(board, odd_guess, depth, search_dict)
+                first_guess, move = AI.mtdf(board, odd_guess, depth, search_dict, killer_moves, history)
                 odd_guess = first_guess
             if start_time + search_time <= time():
                 break
-            if start_time + 1 > time():
-                sleep(1.5)
         return first_guess, move
 
     @staticmethod
     def check_if_terminal(board: HashedLocalVersus):
         """Will check if the board is in an end state."""
 
-        if board.possible_moves["B"] == board.possible_moves["W"] == {}:
+        if board.moves["B"] == board.moves["W"] == 0:
             return True
-        elif board.possible_moves["B"] == {} or board.possible_moves["W"] == {}:
-            count = list(
-                (v, k) for (k, v) in sorted(board.count_pieces().items(), key=lambda item: item[1], reverse=True) if
-                k != "E")  # Sort list of piece count in descending order
-            if count[1][0] == 0:
-                return True
-            else:
-                return False
+        elif board.moves["B"] == 0 or board.moves["W"] == 0:
+            return board.W == 0 or board.B == 0  # One colour has no pieces left
         else:
             return False
 
@@ -560,261 +664,198 @@ class AI(LocalVersus):
     def terminal_utility(othello: HashedLocalVersus):
         """Counts the score of a board if an end state."""
 
-        count = list(
-            (v, k) for (k, v) in sorted(othello.count_pieces().items(), key=lambda item: item[1], reverse=True) if
-            k != "E")  # Sort list of piece count in descending order
-        if count[0][0] == count[1][0]:  # Try
+        white, black = bit_count(othello.W), bit_count(othello.B)
+        if white == black:  # Tie
             return 0
-        elif count[0][1] == "W":  # 85 used as max from heuristic is 85
-            return 85 + count[0][0] - count[1][0]
+        elif white > black:  # 85 used as max from heuristic is 85
+            return 85 + white - black
         else:
-            return -85 - count[0][0] + count[1][0]
+            return -85 - black + white
 
     @staticmethod
-    def heuristic_utility(othello: HashedLocalVersus):
+    @lru_cache(maxsize=HEURISTIC_CACHE_SIZE)
+    def heuristic_utility(white, black, white_moves, black_moves):
         """
         Calculates the heuristic utility of a board. The board values are based off this paper:
         https://courses.cs.washington.edu/courses/cse573/04au/Project/mini1/RUSSIA/Final_Paper.pdf
+        The result is cached as the same position is often reached through different orders of moves.
         """
 
-        count = othello.count_pieces()
-        heuristic_piece_count = (count["W"] - count["B"]) / (count["W"] + count["B"])
-
-        white_move_count = len(othello.possible_moves["W"])
-        black_move_count = len(othello.possible_moves["B"])
-
-        heuristic_mobility = (white_move_count - black_move_count) / (white_move_count + black_move_count)
-
-        piece_to_heuristic = {"W": 1, "B": -1, "E": 0}
-        total_corners_captured = (abs(piece_to_heuristic[othello.board[0][0]]) +
-                                  abs(piece_to_heuristic[othello.board[BOARD_SIZE - 1][0]]) +
-                                  abs(piece_to_heuristic[othello.board[0][BOARD_SIZE - 1]]) +
-                                  abs(piece_to_heuristic[othello.board[BOARD_SIZE - 1][BOARD_SIZE - 1]]))
-        if total_corners_captured != 0:  # Division by zero error
-            heuristic_corner_capture = (
-                                               piece_to_heuristic[othello.board[0][0]] +
-                                               piece_to_heuristic[othello.board[BOARD_SIZE - 1][0]] +
-                                               piece_to_heuristic[othello.board[0][BOARD_SIZE - 1]] +
-                                               piece_to_heuristic[othello.board[BOARD_SIZE - 1][
-                                                   BOARD_SIZE - 1]]) / total_corners_captured
-        else:
-            heuristic_corner_capture = 0
-
-        # Check for stability (Using an estimation as computationally expensive to correctly calculate
-        if othello.board[0][0] != 'E' or othello.board[0][BOARD_SIZE - 1] != 'E' or othello.board[BOARD_SIZE - 1][0] != 'E' or \
-                othello.board[BOARD_SIZE - 1][BOARD_SIZE - 1] != 'E':
-            tracked_black = set((y, x) for x in range(BOARD_SIZE) for y in range(BOARD_SIZE) if othello.board[y][x] == 'B')
-            tracked_white = set((y, x) for x in range(BOARD_SIZE) for y in range(BOARD_SIZE) if othello.board[y][x] == 'W')
-            for y, x, position in AI.stability_iterator():
-                if position == 1:
-                    last_black_opposing = 'N'  # N for None
-                    last_white_opposing = 'N'
-                elif position == 2:
-                    last_black_opposing = 'N'
-                    last_white_opposing = 'N'
-                    if len(tracked_black) == 0 and len(tracked_white) == 0:
-                        break
-                if last_black_opposing != 'N':
-                    if othello.board[y][x] == 'E':
-                        if len(last_black_empty) > 0:
-                            tracked_black -= last_black_empty
-                            last_black_empty = set()
-                        last_black_opposing = 'E'
-
-                    elif othello.board[y][x] == 'W':
-                        if len(last_black_empty) > 0:
-                            if last_black_opposing == 'E':
-                                tracked_black -= last_black_empty
-                                last_black_empty = set()
-                        else:
-                            last_black_opposing = 'W'
-                    else:
-                        last_black_empty.add((y, x))
-                elif othello.board[y][x] == 'E' or othello.board[y][x] == 'W':
-                    last_black_opposing = othello.board[y][x]
-                    last_black_empty = set()
-
-                if last_white_opposing != 'N':
-                    if othello.board[y][x] == 'E':
-                        if len(last_white_empty) > 0:
-                            tracked_white -= last_white_empty
-                            last_white_empty = set()
-                        last_white_opposing = 'E'
-
-                    elif othello.board[y][x] == 'B':
-                        if len(last_white_empty) > 0:
-                            if last_white_opposing == 'E':
-                                tracked_white -= last_white_empty
-                                last_white_empty = set()
-                        else:
-                            last_white_opposing = 'B'
-                    else:
-                        last_white_empty.add((y, x))
-                elif othello.board[y][x] == 'E' or othello.board[y][x] == 'B':
-                    last_white_opposing = othello.board[y][x]
-                    last_white_empty = set()
-        else:
-            tracked_black = []
-            tracked_white = []
-
-        black_stability = len(tracked_black)
-        white_stability = len(tracked_white)
-
-        if white_stability + black_stability != 0:  # Division by zero error
-            heuristic_stability = (white_stability - black_stability) / (white_stability + black_stability)
-        else:
-            heuristic_stability = 0
-
-        return 30 * heuristic_corner_capture + heuristic_mobility * 5 + heuristic_stability * 25 + heuristic_piece_count * 25
-
-    @staticmethod
-    def stability_iterator():
-        """
-        Will iterate through every move line to remove unstable pieces from stability list.
-        The position indicates extra code that should be run at certain points in time.
-        0 means do nothing, 1 reset last_known, 2 do things in 1 and check if there are still stable pieces.
-        """
-        position = 0
-        for y in range(BOARD_SIZE):
-            if position == 0:
-                position = 1
-            for x in range(BOARD_SIZE):
-                yield y, x, position
-                position = 0
-
-        position = 2
-        for x in range(BOARD_SIZE):
-            if position == 0:
-                position = 1
-            for y in range(BOARD_SIZE):
-                yield y, x, position
-                position = 0
-
-        position = 2
-        for y, x in LEFT_RIGHT_DIAGONALS:
-            if position == 0:
-                position = 1
-            while y < BOARD_SIZE and x < BOARD_SIZE:
-                yield y, x, position
-                position = 0
-                y += 1
-                x += 1
-
-        position = 2
-        for y, x in RIGHT_LEFT_DIAGONALS:
-            if position == 0:
-                position = 1
-            while y < BOARD_SIZE and x >= 0:
-                yield y, x, position
-                position = 0
-                y += 1
-                x += -1
-
-    @staticmethod
-    def dumb_line_iterator(y, x, line_diff):  # working in (y,x)
-        """Will iterate through a line without caring about the pieces it iterates through."""
-
-        while 0 >= x > BOARD_SIZE and 0 >= y > BOARD_SIZE:
-            yield y, x
-            y += line_diff[0]
-            x += line_diff[1]
+        return heuristic(white, black, white_moves, black_moves)
 
     @staticmethod
-    def minimax(board: HashedLocalVersus, alpha, beta, maximising_player, initial, lookahead, searched_moves):
+    def minimax(board: HashedLocalVersus, alpha, beta, maximising_player, initial, lookahead, searched_moves,
+                killer_moves, history):
         """
         The minimax algorithm with memory to ensure that values are not computed several times.
         This version uses alpha beta to cut values that would not affect the final value.
+        Instead of recursing, every board being searched has a frame on a stack so no function call is made per board.
         Some of the code is based off this thread:
         https://www.gamedev.net/forums/topic.asp?topic_id=503234
         """
 
-        if (search := searched_moves.get(board.board_state)) is not None and search[2] >= lookahead:
-
-            value, type_of_info, depth, move = search
-            if type_of_info == 1:
-                if initial:
-                    return value, move
-                return value
-            elif type_of_info == 0:  # Lower bound
-                alpha = max(alpha, value)
-            elif type_of_info == 2:  # Upper bound
-                beta = min(beta, value)
-            if alpha >= beta:
-                if initial:
-                    return value, move
-                return value
-            check_move_first = move
-        else:
-            check_move_first = None
-
-        if AI.check_if_terminal(board):
-            return AI.terminal_utility(board)
-        elif lookahead <= 0:
-            return AI.heuristic_utility(board)
-
-        if maximising_player:
-            score = float('-inf')
-            sorted_actions = AI.sort_actions(board.possible_moves["W"].keys(), board, check_move_first, 1, "W")
-            a = alpha
-            for new_board, possible_action in sorted_actions:
-                # Ensures the move check_move_first is checked first
-                evaluation = AI.minimax(new_board, a, beta, len(new_board.possible_moves["B"]) == 0, False,
-                                        lookahead - 1, searched_moves)
-                if score < evaluation:
-                    action = possible_action
-                score = max(score, evaluation)
-                a = max(a, score)
-                if a >= beta:
-                    break
-
-        else:
-            score = float('inf')
-            sorted_actions = AI.sort_actions(board.possible_moves["B"].keys(), board, check_move_first, -1, "B")
-            b = beta
-            for new_board, possible_action in sorted_actions:
-                evaluation = AI.minimax(new_board, alpha, b, len(new_board.possible_moves["W"]) != 0, False,
-                                        lookahead - 1, searched_moves)
-                if score > evaluation:
-                    action = possible_action
-                score = min(score, evaluation)
-                b = min(b, score)
-                if b <= alpha:
+        root, root_lookahead = board.state(), lookahead
+        stack = []
+        frame = None
+        while True:
+            # Evaluates the board that was just moved to, creating a frame if its moves need to be searched
+            zobrist_hash = board.hash_num if maximising_player else board.hash_num ^ board.table_turn
+            slot = zobrist_hash & TRANSPOSITION_TABLE_MASK
+            value = check_move_first = None
+            alpha_orig, beta_orig = alpha, beta
+            if ((search := searched_moves.get(slot)) is not None and search.hash_num == zobrist_hash
+                    and search.depth >= lookahead):
+
+                value, type_of_info, check_move_first = search.value, search.type_of_info, search.move
+                if type_of_info == 0:  # Lower bound
+                    alpha = max(alpha, value)
+                elif type_of_info == 2:  # Upper bound
+                    beta = min(beta, value)
+                if type_of_info == 1 or alpha >= beta:
+                    if initial and not stack:
+                        return value, check_move_first
+                else:
+                    value = None
+
+            if value is None:
+                if AI.check_if_terminal(board):
+                    value = AI.terminal_utility(board)
+                elif lookahead <= 0:
+                    value = AI.heuristic_utility(board.W, board.B, board.moves["W"], board.moves["B"])
+                else:
+                    player = "W" if maximising_player else "B"
+                    # Ensures the move check_move_first is checked first
+                    sorted_actions = AI.sort_actions(bit_positions(board.moves[player]), board, check_move_first,
+                                                     player, alpha, beta, lookahead - 1, searched_moves,
+                                                     killer_moves[root_lookahead - lookahead], history[player])
+                    stack.append(SearchFrame(zobrist_hash, sorted_actions, alpha_orig, beta_orig, alpha, beta,
+                                             maximising_player, lookahead))
+
+            # Passes values back up the stack until a board that still needs searching is found
+            while stack:
+                frame = stack[-1]
+                if value is not None:  # The value of the frame's current move
+                    if frame.maximising_player:
+                        if frame.score < value:
+                            frame.score, frame.action = value, frame.current_action
+                            frame.window_alpha = max(frame.window_alpha, value)
+                    elif frame.score > value:
+                        frame.score, frame.action = value, frame.current_action
+                        frame.window_beta = min(frame.window_beta, value)
+
+                if frame.window_alpha >= frame.window_beta:
+                    killers = killer_moves[root_lookahead - frame.lookahead]
+                    if frame.action != killers[0]:
+                        killers[1], killers[0] = killers[0], frame.action
+                    x, y = frame.action
+                    history["W" if frame.maximising_player else "B"][y * BOARD_SIZE + x] += frame.lookahead ** 2
+                    child = None
+                else:
+                    child = next(frame.actions, None)
+                if child is None:
+                    stack.pop()
+                    AI.store_search(searched_moves, frame)
+                    value = frame.score
+                    continue
+
+                state, frame.current_action, value, maximising_player = child
+                if value is None:  # Not in the search dictionary so the move is searched
+                    board.restore(state)
+                    alpha, beta = frame.window_alpha, frame.window_beta
+                    lookahead = frame.lookahead - 1
                     break
+            else:
+                board.restore(root)
+                if initial and frame is not None:
+                    return frame.score, frame.action
+                return value
 
-        if score <= alpha:
-            searched_moves[board.board_state] = (score, 2, lookahead, action)
-        if alpha < score < beta:
-            searched_moves[board.board_state] = (score, 1, lookahead, action)
-        if score >= beta:
-            searched_moves[board.board_state] = (score, 0, lookahead, action)
-
-        if initial:
-            return score, action
-        else:
-            return score
+    @staticmethod
+    def store_search(searched_moves, frame):
+        """Stores the result of a searched frame in the search dictionary."""
+
+        zobrist_hash, lookahead, score = frame.hash_num, frame.lookahead, frame.score
+        slot = zobrist_hash & TRANSPOSITION_TABLE_MASK
+        # Upper bound if it failed low, lower bound if it failed high, otherwise exact
+        type_of_info = 2 if score <= frame.alpha_orig else 0 if score >= frame.beta_orig else 1
+        # A deeper search already in the slot is only replaced by an exact value,
+        # equal depths are replaced as MTD(f) searches the same depth again with a new window
+        if (stored := searched_moves.get(slot)) is None or stored.depth <= lookahead or type_of_info == 1:
+            searched_moves[slot] = SearchEntry(zobrist_hash, score, type_of_info, lookahead, frame.action)
 
     @staticmethod
-    def sort_actions(actions, board, check_move_first, factor, player):
+    def sort_actions(actions, board, check_move_first, player, alpha, beta, lookahead, searched_moves, killers,
+                     history):
         """
         Sorts the actions that can be done on an initial board in a manner so that
         the first one is most likely to be the board layout with the highest score.
+        Moves whose value is already known from the search dictionary come first as they do not need searching,
+        then the best move from the search dictionary, then the killer moves that caused a cut at the same ply,
+        then the best positions such as corners,
+        with ties broken by the history of cuts made by each square and then the amount of pieces flipped.
+        The moves are only scored here, see select_actions for how they are played.
         """
 
-        boards = []
+        legal = board.legal_moves(player)
+        factor = 1 if player == "W" else -1
+        # The child is looked up as if the other player moves next, a child where they must pass is never found
+        # as it is stored with the hash of the player that moves again and so it is simply searched instead
+        turn = board.table_turn if player == "W" else 0
+        scored = []
         for action in actions:
-            new_board = deepcopy(board)
-            new_board.place(action, player)
-            boards.append((new_board, action))
-        return sorted(boards, reverse=True, key=lambda x: (x[1] == check_move_first)*50000 + AI.utility(x[0],x[1], factor))
+            square = action[1] * BOARD_SIZE + action[0]
+            value = None
+            if lookahead > 0:  # Children at the horizon are cheap to evaluate and are not worth looking up
+                value = AI.get_ordering_value(board.move_hash(square, player) ^ turn, alpha, beta, lookahead,
+                                              searched_moves)
+            if value is None:
+                key = (0, (action == check_move_first) * 50000 + (action == killers[0]) * 10000
+                       + (action == killers[1]) * 5000 + BOARD_WEIGHT_FLAT[square],
+                       history[square], bit_count(legal[square]))
+            else:
+                key = (1, value * factor, 0, 0)
+            scored.append((key, action, value))
+        return AI.select_actions(scored, board, player)
+
+    @staticmethod
+    def select_actions(scored, board, player):
+        """
+        Yields the moves from the highest score to the lowest by picking the best remaining one each time,
+        as a cut often happens after the first few moves and so the rest never need to be ordered or played.
+        Each move is only played on the board once it is picked, yielding the state of the board after the move
+        with its known value, or None if it still needs to be searched, and whether white plays next.
+        Moves with a known value are never played.
+        """
+
+        parent = board.state()
+        while scored:
+            best = 0
+            for index in range(1, len(scored)):
+                if scored[index][0] > scored[best][0]:  # Strictly greater so that ties keep their order
+                    best = index
+            _, action, value = scored.pop(best)
+            if value is not None:
+                yield None, action, value, None
+                continue
+            board.restore(parent)  # The board may have been moved to another board since the last move
+            board.place(action, player)
+            maximising_player = board.moves["B"] == 0 if player == "W" else board.moves["W"] != 0
+            yield board.state(), action, None, maximising_player
 
     @staticmethod
-    def utility(board, move, factor):
-        """Will quickly return an estimation of a board's more computationally expensive estimation of utility."""
+    def get_ordering_value(zobrist_hash, alpha, beta, lookahead, searched_moves):
+        """
+        Returns the value of a board from the search dictionary if it is exact or a bound
+        that would cause a cut between alpha and beta, otherwise returns None.
+        """
 
-        if AI.check_if_terminal(board):
-            return AI.terminal_utility(board) * 10 * factor
-        else:
-            return BOARD_WEIGHT[move[0]][move[1]]
+        search = searched_moves.get(zobrist_hash & TRANSPOSITION_TABLE_MASK)
+        if search is None or search.hash_num != zobrist_hash or search.depth < lookahead:
+            return None
+        value, type_of_info = search.value, search.type_of_info
+        if type_of_info == 1 or (type_of_info == 0 and value >= beta) or (type_of_info == 2 and value <= alpha):
+            return value
+        return None
 
 
 class LoadLocalVersus(LocalVersus):
@@ -828,27 +869,20 @@ class LoadLocalVersus(LocalVersus):
         self.line_count = line_count
         super(LoadLocalVersus, self).__init__(gui_to_oth, oth_to_gui)
 
-    @staticmethod
-    def get_pos_from_file(line):
-        """Gets the instruction back from the file."""
-
-        line = line.split(",")
-        return int(line[0]), int(line[1])
-
     def load(self):
         """Loads the save file."""
 
-        with open(path.join(SAVE_DIR, self.save_name), 'r') as file:
-            commands = file.readlines()
+        moves = read_save_file(self.save_name)
         line_count = 0
-        for line, self.playing_colour in zip(commands, self.end_game_iterator(self.playing_colour)):
+        for pos, self.playing_colour in zip(moves, self.end_game_iterator(self.playing_colour)):
             if line_count == self.line_count:
                 break
             line_count += 1
-            if not (tup := self.can_be_placed(self.get_pos_from_file(line), self.playing_colour))[1]:  # Walrus op
+            if not (tup := self.can_be_placed(pos, self.playing_colour))[1]:  # Walrus op
                 raise BoardError("Incorrect Board")
-            self.save(tup[0])
+            self.save(tup[0], False)
             self.place(tup[0], self.playing_colour)
+        self.flush_save()
         self.playing_colour = FLIP_RULE[self.playing_colour]
 
     def play(self):
@@ -869,27 +903,20 @@ class LoadAI(AI):
         self.line_count = line_count
         super(LoadAI, self).__init__(gui_to_oth, oth_to_gui, difficulty)
 
-    @staticmethod
-    def get_pos_from_file(line):
-        """Gets the instruction back from the file."""
-
-        line = line.split(",")
-        return int(line[0]), int(line[1])
-
     def load(self):
         """Loads the save file."""
 
-        with open(path.join(SAVE_DIR, self.save_name), 'r') as file:
-            commands = file.readlines()
+        moves = read_save_file(self.save_name)
         line_count = 0
-        for line, self.playing_colour in zip(commands, self.end_game_iterator(self.playing_colour)):
+        for pos, self.playing_colour in zip(moves, self.end_game_iterator(self.playing_colour)):
             if line_count == self.line_count:
                 break
             line_count += 1
-            if not (tup := self.can_be_placed(self.get_pos_from_file(line), self.playing_colour))[1]:  # Walrus op
+            if not (tup := self.can_be_placed(pos, self.playing_colour))[1]:  # Walrus op
                 raise BoardError("Incorrect Board")
-            self.save(tup[0])
+            self.save(tup[0], False)
             self.place(tup[0], self.playing_colour)
+        self.flush_save()
         self.playing_colour = FLIP_RULE[self.playing_colour]
 
     def play(self):
@@ -908,10 +935,15 @@ class Text(Othello):
     def print_board(self):
         """Prints the board in text form."""
 
-        board_copy = [[x.replace("E", " ") for x in self.board[y]] for y in range(BOARD_SIZE)]
+        cells = bytearray(b" " * (BOARD_SIZE * BOARD_SIZE))  # One flat buffer with empty squares as spaces
+        for square in bit_squares(self.W):
+            cells[square] = ord("W")
+        for square in bit_squares(self.B):
+            cells[square] = ord("B")
+        cells = cells.decode()
         print(*(list(" ") + list(range(BOARD_SIZE))), sep=" | ", end=" |\n")
-        for x in range(BOARD_SIZE):
-            print(*(list(str(x)) + board_copy[x]), sep=" | ", end=" |\n")
+        for y in range(BOARD_SIZE):
+            print(y, *cells[y * BOARD_SIZE:(y + 1) * BOARD_SIZE], sep=" | ", end=" |\n")
 
     def evaluate_winner(self):
         """Evaluate winner in text."""
@@ -952,19 +984,18 @@ class SavedGamesLoader(Othello):
         """
 
         if not self.commands:
-            with open(path.join(SAVE_DIR, self.save_name), 'r') as file:
-                self.commands = file.readlines()
+            self.commands = read_save_file(self.save_name)
             self.max_line = len(self.commands)
         line_count = 0
-        for line, self.colour in zip(self.commands, self.end_game_iterator(FLIP_RULE[self.colour])):
-            self.previous_states.append(deepcopy((self.board, self.colour)))
+        for pos, self.colour in zip(self.commands, self.end_game_iterator(FLIP_RULE[self.colour])):
+            self.previous_states.append((self.W, self.B, self.colour))
             if line_count == self.seek_amount:
                 break
             line_count += 1
-            if not (tup := self.can_be_placed(self.get_pos(line), self.colour))[1]:  # Walrus op for the win
+            if not (tup := self.can_be_placed(pos, self.colour))[1]:  # Walrus op for the win
                 raise BoardError("Incorrect Board")  # TODO
             self.place(tup[0], self.colour)
-        self.previous_states.append(deepcopy((self.board, self.colour)))
+        self.previous_states.append((self.W, self.B, self.colour))
         self.current_line = self.max_line
         return ["PrintFull"], self.board
 
@@ -993,20 +1024,13 @@ class SavedGamesLoader(Othello):
 
         return LOCAL_IO["Board"], self.board
 
-    def update_board_state(self, board, colour):
+    def update_board_state(self, white, black, colour):
         """Updates the board states correctly by calling board_change."""
 
         self.colour = colour
-        self.board = board
+        self.W, self.B = white, black
         self.board_change()
 
-    @staticmethod
-    def get_pos(line):
-        """Gets the position from the commands."""
-
-        line = line.split(",")
-        return int(line[0]), int(line[1])
-
     def delete_file(self):
         """Deletes the file."""
 